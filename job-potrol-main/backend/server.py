@@ -1,18 +1,26 @@
 from fastapi import FastAPI, APIRouter, File, UploadFile, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
+import base64
+import json
+import re
 from datetime import datetime, timezone
-import requests
-import PyPDF2
+import httpx
+import pypdfium2 as pdfium
 import io
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from llm_cache import LlmResponseCache, normalize_text
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -23,7 +31,7 @@ client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -31,8 +39,33 @@ api_router = APIRouter(prefix="/api")
 # Initialize Gemini LLM
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 
+# Maximum number of concurrent Gemini requests per match run
+LLM_CONCURRENCY = 8
+
+LLM_SYSTEM_MESSAGES = {
+    "skills-extraction": "You are a skilled HR expert who extracts technical and professional skills from text. Return only a comma-separated list of skills, no additional text or formatting.",
+    "skills-extraction-batch": "You are a skilled HR expert who extracts technical and professional skills from text. Return only a JSON object mapping each id to a list of skills, no additional text or formatting.",
+    "match-explanation": "You are an expert career counselor who provides detailed explanations for job-candidate matches. Be concise but informative."
+}
+
+# Number of top matches returned and explained per match run
+TOP_MATCHES = 10
+
+# Number of texts combined into a single batched skill extraction prompt
+SKILLS_BATCH_SIZE = 10
+
+# Bump to re-extract skills for all stored jobs on next startup
+SKILLS_EXTRACTION_VERSION = 1
+
+# Jobs loaded and written per step of the startup skills backfill
+BACKFILL_CHUNK_SIZE = SKILLS_BATCH_SIZE * LLM_CONCURRENCY
+
+def new_id() -> str:
+    """Generate a compact 22-character URL-safe document id from a random UUID"""
+    return base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode()
+
 class Job(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     title: str
     company: str
     location: str
@@ -49,27 +82,36 @@ class JobCreate(BaseModel):
     requirements: str = ""
 
 class Resume(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     filename: str
     text_content: str
     skills_extracted: List[str] = []
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class JobMatch(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     resume_id: str
     job_id: str
     match_score: float
     matching_skills: List[str]
     missing_skills: List[str]
-    explanation: str
+    explanation: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# Mongo projections limiting documents to the fields the API needs
+JOB_PROJECTION = {field: 1 for field in Job.model_fields} | {"_id": 0}
+JOB_TEXT_PROJECTION = {"id": 1, "title": 1, "description": 1, "requirements": 1, "_id": 0}
+RESUME_MATCH_PROJECTION = {"skills_extracted": 1, "_id": 0}
+
+# Datetime fields stored as ISO strings in MongoDB
+_DT_FIELDS = ("created_at", "uploaded_at")
+
 # Helper functions
 def prepare_for_mongo(data):
     """Convert datetime objects to ISO strings for MongoDB storage"""
     if isinstance(data, dict):
-        for key, value in data.items():
+        for key in _DT_FIELDS:
+            value = data.get(key)
             if isinstance(value, datetime):
                 data[key] = value.isoformat()
     return data
@@ -77,22 +119,71 @@ def prepare_for_mongo(data):
 def parse_from_mongo(item):
     """Convert ISO strings back to datetime objects from MongoDB"""
     if isinstance(item, dict):
-        for key, value in item.items():
-            if key.endswith('_at') and isinstance(value, str):
-                try:
-                    item[key] = datetime.fromisoformat(value)
-                except:
-                    pass
+        for key in _DT_FIELDS:
+            value = item.get(key)
+            if isinstance(value, str):
+                item[key] = datetime.fromisoformat(value)
     return item
 
+# LLM response cache
+llm_cache = LlmResponseCache()
+
+def _skills_cache_key(text: str, context: str) -> Tuple[str, ...]:
+    """Cache and in-flight key for skill extraction from text"""
+    return ("skills", context, normalize_text(text[:2000]))
+
+
+def _new_chat(purpose: str) -> LlmChat:
+    """Create a Gemini chat for a single exchange"""
+    # LlmChat keeps its session's history, so sessions are not shared across exchanges
+    return LlmChat(
+        api_key=GEMINI_API_KEY,
+        session_id=f"{purpose}-{uuid.uuid4().hex}",
+        system_message=LLM_SYSTEM_MESSAGES[purpose]
+    ).with_model("gemini", "gemini-2.0-flash")
+
+def _clean_skills(skills: List[str]) -> List[str]:
+    """Clean and filter skills (remove empty, very short, or generic terms)"""
+    cleaned_skills = []
+    for skill in skills:
+        skill = str(skill).strip().title()
+        if len(skill) > 1 and not skill.lower() in ['and', 'or', 'the', 'with', 'for', 'in', 'on', 'at']:
+            cleaned_skills.append(skill)
+    return cleaned_skills[:20]  # Limit to top 20 skills
+
+def _job_text(job: Dict[str, Any]) -> str:
+    """Text used for job skill extraction"""
+    return f"{job['title']} {job['description']} {job['requirements']}"
+
+# In-flight LLM calls shared by concurrent identical requests
+_inflight: Dict[Tuple, asyncio.Task] = {}
+
+def _start_inflight(key: Tuple, make_call) -> asyncio.Task:
+    """Return the in-flight call for key, starting it if none is running"""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(make_call())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+async def _coalesce(key: Tuple, make_call):
+    """Await the in-flight call for key, starting it if none is running"""
+    # Shield so one cancelled caller does not cancel the call for the others
+    return await asyncio.shield(_start_inflight(key, make_call))
+
 async def extract_skills_with_llm(text: str, context: str = "job description") -> List[str]:
     """Extract skills from text using Gemini LLM"""
+    cached = llm_cache.get(_skills_cache_key(text, context))
+    if cached is not None:
+        return list(cached)
+    
+    skills = await _coalesce(_skills_cache_key(text, context), lambda: _extract_skills_uncached(text, context))
+    return list(skills)
+
+async def _extract_skills_uncached(text: str, context: str) -> List[str]:
     try:
-        chat = LlmChat(
-            api_key=GEMINI_API_KEY,
-            session_id=f"skills-extraction-{uuid.uuid4()}",
-            system_message="You are a skilled HR expert who extracts technical and professional skills from text. Return only a comma-separated list of skills, no additional text or formatting."
-        ).with_model("gemini", "gemini-2.0-flash")
+        chat = _new_chat("skills-extraction")
         
         user_message = UserMessage(
             text=f"Extract all relevant skills from this {context}. Focus on technical skills, programming languages, frameworks, tools, and professional competencies. Text: {text[:2000]}"
@@ -102,80 +193,220 @@ async def extract_skills_with_llm(text: str, context: str = "job description") -
         
         # Parse the response to extract skills
         skills_text = response.strip()
-        skills = [skill.strip() for skill in skills_text.split(',') if skill.strip()]
-        
-        # Clean and filter skills (remove empty, very short, or generic terms)
-        cleaned_skills = []
-        for skill in skills:
-            skill = skill.strip().title()
-            if len(skill) > 1 and not skill.lower() in ['and', 'or', 'the', 'with', 'for', 'in', 'on', 'at']:
-                cleaned_skills.append(skill)
-        
-        return cleaned_skills[:20]  # Limit to top 20 skills
+        cleaned_skills = _clean_skills(skills_text.split(','))
+        llm_cache.put(_skills_cache_key(text, context), cleaned_skills)
+        return cleaned_skills
     except Exception as e:
         logging.error(f"Error extracting skills with LLM: {e}")
         return []
 
-async def calculate_job_match(resume_skills: List[str], job_skills: List[str], resume_text: str, job_text: str) -> Dict[str, Any]:
-    """Calculate match score and explanation using Gemini LLM"""
-    try:
-        # Calculate basic match score
-        resume_skills_lower = [skill.lower() for skill in resume_skills]
-        job_skills_lower = [skill.lower() for skill in job_skills]
-        
-        matching_skills = []
-        for job_skill in job_skills:
-            for resume_skill in resume_skills:
-                if job_skill.lower() == resume_skill.lower() or job_skill.lower() in resume_skill.lower() or resume_skill.lower() in job_skill.lower():
-                    matching_skills.append(job_skill)
-                    break
+async def extract_skills_batch(items: List[Tuple[str, str]], context: str = "job description") -> Dict[str, List[str]]:
+    """Extract skills for many (id, text) pairs using one Gemini prompt per batch"""
+    results: Dict[str, List[str]] = {}
+    waiting: Dict[str, asyncio.Task] = {}
+    pending = []
+    for item_id, text in items:
+        cached = llm_cache.get(_skills_cache_key(text, context))
+        if cached is not None:
+            results[item_id] = list(cached)
+        elif _skills_cache_key(text, context) in _inflight:
+            # Another request is already extracting skills for this text
+            waiting[item_id] = _inflight[_skills_cache_key(text, context)]
+        else:
+            pending.append((item_id, text))
+    
+    sem = asyncio.Semaphore(LLM_CONCURRENCY)
+    
+    async def _extract_one(text: str) -> List[str]:
+        async with sem:
+            return await _extract_skills_uncached(text, context)
+    
+    async def _run_batch(batch: List[Tuple[str, str]]) -> Dict[str, List[str]]:
+        try:
+            chat = _new_chat("skills-extraction-batch")
+            
+            numbered_texts = "\n\n".join(f"[{item_id}]\n{text[:2000]}" for item_id, text in batch)
+            user_message = UserMessage(
+                text=f"Extract all relevant skills from each {context} below. Focus on technical skills, programming languages, frameworks, tools, and professional competencies. Return JSON: {{id: [skills...]}}.\n\n{numbered_texts}"
+            )
+            
+            async with sem:
+                response = await chat.send_message(user_message)
+            
+            # Strip markdown code fences around the JSON payload
+            skills_json = re.sub(r"^```(?:json)?|```$", "", response.strip()).strip()
+            # The model sometimes echoes the [id] markers as keys
+            skills_by_id = {str(key).strip().strip("[]"): value for key, value in json.loads(skills_json).items()}
+        except Exception as e:
+            logging.error(f"Error extracting skills in batch with LLM: {e}")
+            skills_by_id = {}
         
-        missing_skills = [skill for skill in job_skills if skill.lower() not in [ms.lower() for ms in matching_skills]]
+        batch_results = {}
+        for item_id, text in batch:
+            skills = skills_by_id.get(item_id)
+            if isinstance(skills, str):
+                skills = skills.split(',')
+            if not isinstance(skills, list):
+                continue  # Missing or malformed answers fall back to a single-item prompt
+            skills = _clean_skills(skills)
+            if skills:
+                llm_cache.put(_skills_cache_key(text, context), skills)
+            batch_results[item_id] = skills
         
-        if len(job_skills) > 0:
-            match_score = (len(matching_skills) / len(job_skills)) * 100
-        else:
-            match_score = 0
+        # Fall back to one prompt per item for anything the batch did not answer
+        unanswered = [(item_id, text) for item_id, text in batch if item_id not in batch_results]
+        if unanswered:
+            fallback = await asyncio.gather(*[_extract_one(text) for _, text in unanswered])
+            batch_results.update(zip([item_id for item_id, _ in unanswered], fallback))
+        return batch_results
+    
+    async def _batch_item(batch_task: asyncio.Task, item_id: str) -> List[str]:
+        return (await asyncio.shield(batch_task))[item_id]
+    
+    # Register every item as in flight so concurrent requests for the same text share its batch
+    for i in range(0, len(pending), SKILLS_BATCH_SIZE):
+        batch = pending[i:i + SKILLS_BATCH_SIZE]
+        batch_task = asyncio.ensure_future(_run_batch(batch))
+        for item_id, text in batch:
+            waiting[item_id] = _start_inflight(
+                _skills_cache_key(text, context),
+                lambda batch_task=batch_task, item_id=item_id: _batch_item(batch_task, item_id)
+            )
+    
+    skills_lists = await asyncio.gather(*[asyncio.shield(task) for task in waiting.values()])
+    results.update((item_id, list(skills)) for item_id, skills in zip(waiting, skills_lists))
+    return results
+
+async def _attach_job_skills(jobs: List[Dict[str, Any]]) -> None:
+    """Extract skills for jobs in batched prompts and set them on the job dicts"""
+    skills_by_id = await extract_skills_batch([(job["id"], _job_text(job)) for job in jobs])
+    for job in jobs:
+        job["skills_extracted"] = skills_by_id.get(job["id"], [])
+        if job["skills_extracted"]:
+            job["skills_extracted_version"] = SKILLS_EXTRACTION_VERSION
+
+async def _store_job_skills(jobs: List[Dict[str, Any]]) -> None:
+    """Extract skills for stored jobs and write them back"""
+    await _attach_job_skills(jobs)
+    await db.jobs.bulk_write([
+        UpdateOne({"id": job["id"]}, {"$set": {
+            "skills_extracted": job["skills_extracted"],
+            "skills_extracted_version": job.get("skills_extracted_version")
+        }})
+        for job in jobs
+    ], ordered=False)
+
+async def _backfill_job_skills():
+    """Extract and store skills for jobs that are missing them or are outdated"""
+    try:
+        # Jobs extracted before versioning keep their skills and are tagged without an LLM call
+        await db.jobs.update_many(
+            {"skills_extracted.0": {"$exists": True}, "skills_extracted_version": {"$exists": False}},
+            {"$set": {"skills_extracted_version": SKILLS_EXTRACTION_VERSION}}
+        )
         
-        # Generate explanation using LLM
-        chat = LlmChat(
-            api_key=GEMINI_API_KEY,
-            session_id=f"match-explanation-{uuid.uuid4()}",
-            system_message="You are an expert career counselor who provides detailed explanations for job-candidate matches. Be concise but informative."
-        ).with_model("gemini", "gemini-2.0-flash")
+        cursor = db.jobs.find({"$or": [
+            {"skills_extracted": {"$exists": False}},
+            {"skills_extracted": {"$size": 0}},
+            {"skills_extracted_version": {"$exists": True, "$ne": SKILLS_EXTRACTION_VERSION}}
+        ]}, JOB_TEXT_PROJECTION)
         
+        chunk = []
+        async for job in cursor:
+            chunk.append(job)
+            if len(chunk) == BACKFILL_CHUNK_SIZE:
+                await _store_job_skills(chunk)
+                chunk = []
+        if chunk:
+            await _store_job_skills(chunk)
+    except Exception as e:
+        logging.error(f"Error backfilling job skills: {e}")
+
+def _prepare_resume_skills(resume_skills: List[str]) -> Tuple[set, Optional[re.Pattern], str]:
+    """Build the lookup structures for a resume's skills once per match run"""
+    resume_skills_lower = {skill.lower() for skill in resume_skills}
+    resume_pattern = re.compile("|".join(map(re.escape, resume_skills_lower))) if resume_skills_lower else None
+    resume_joined = "\n".join(resume_skills_lower)
+    return resume_skills_lower, resume_pattern, resume_joined
+
+def _match_skills(resume_lookup: Tuple[set, Optional[re.Pattern], str], job_skills: List[str]) -> Tuple[List[str], List[str]]:
+    """Split job skills into those covered by the resume and those missing from it"""
+    resume_skills_lower, resume_pattern, resume_joined = resume_lookup
+    
+    # A job skill matches when it equals, contains, or is contained in a resume skill
+    matching_skills = []
+    missing_skills = []
+    for job_skill in job_skills:
+        job_skill_lower = job_skill.lower()
+        if job_skill_lower in resume_skills_lower or (
+            resume_pattern is not None and (job_skill_lower in resume_joined or resume_pattern.search(job_skill_lower))
+        ):
+            matching_skills.append(job_skill)
+        else:
+            missing_skills.append(job_skill)
+    return matching_skills, missing_skills
+
+def _score_job_match(resume_lookup: Tuple[set, Optional[re.Pattern], str], job_skills: List[str]) -> Dict[str, Any]:
+    """Calculate match score and matching/missing skills without calling the LLM"""
+    matching_skills, missing_skills = _match_skills(resume_lookup, job_skills)
+    
+    if len(job_skills) > 0:
+        match_score = (len(matching_skills) / len(job_skills)) * 100
+    else:
+        match_score = 0
+    
+    return {
+        "match_score": round(match_score, 1),
+        "matching_skills": list(dict.fromkeys(matching_skills)),
+        "missing_skills": list(dict.fromkeys(missing_skills)),
+        "explanation": None
+    }
+
+async def _generate_explanation(explanation_prompt: str, cache_key: Tuple) -> str:
+    chat = _new_chat("match-explanation")
+    user_message = UserMessage(text=explanation_prompt)
+    explanation = await chat.send_message(user_message)
+    llm_cache.put(cache_key, explanation)
+    return explanation
+
+async def _explain_job_match(match_result: Dict[str, Any]) -> str:
+    """Generate a match explanation using Gemini LLM"""
+    try:
+        match_score = match_result["match_score"]
         explanation_prompt = f"""
         Analyze this job match:
         Match Score: {match_score:.1f}%
-        Matching Skills: {', '.join(matching_skills)}
-        Missing Skills: {', '.join(missing_skills)}
+        Matching Skills: {', '.join(match_result["matching_skills"])}
+        Missing Skills: {', '.join(match_result["missing_skills"])}
         
         Provide a brief explanation (2-3 sentences) of why this candidate is a {match_score:.1f}% match for this position.
         """
         
-        user_message = UserMessage(text=explanation_prompt)
-        explanation = await chat.send_message(user_message)
+        # Explanations are only reused for the exact same score and skill lists
+        cache_key = (
+            "explanation",
+            match_score,
+            tuple(match_result["matching_skills"]),
+            tuple(match_result["missing_skills"])
+        )
+        explanation = llm_cache.get(cache_key)
+        if explanation is None:
+            explanation = await _coalesce(
+                cache_key,
+                lambda: _generate_explanation(explanation_prompt, cache_key)
+            )
         
-        return {
-            "match_score": round(match_score, 1),
-            "matching_skills": list(set(matching_skills)),
-            "missing_skills": list(set(missing_skills)),
-            "explanation": explanation.strip()
-        }
+        return explanation.strip()
     except Exception as e:
-        logging.error(f"Error calculating job match: {e}")
-        return {
-            "match_score": 0,
-            "matching_skills": [],
-            "missing_skills": job_skills,
-            "explanation": "Unable to generate match analysis at this time."
-        }
+        logging.error(f"Error generating match explanation: {e}")
+        return "Unable to generate match analysis at this time."
 
 # Fetch jobs from external API and populate database
 async def populate_jobs_from_api():
     """Fetch jobs from jsonplaceholder and adapt them as job listings"""
     try:
-        response = requests.get("https://jsonplaceholder.typicode.com/posts")
+        async with httpx.AsyncClient(timeout=10) as http_client:
+            response = await http_client.get("https://jsonplaceholder.typicode.com/posts")
         posts = response.json()
         
         job_templates = [
@@ -191,9 +422,18 @@ async def populate_jobs_from_api():
             {"title": "Mobile Developer", "company": "AppBuilder", "location": "Miami, FL"}
         ]
         
-        jobs_created = 0
+        # Look up which title/company pairs already exist in a single query
+        titles = list({template['title'] for template in job_templates})
+        existing = {
+            (job['title'], job['company'])
+            async for job in db.jobs.find({"title": {"$in": titles}}, {"title": 1, "company": 1, "_id": 0})
+        }
+        
+        new_jobs = []
         for i, post in enumerate(posts[:30]):  # Limit to 30 jobs
             template = job_templates[i % len(job_templates)]
+            if (template['title'], template['company']) in existing:
+                continue
             
             # Create job description from post content
             job_description = f"""
@@ -211,8 +451,8 @@ async def populate_jobs_from_api():
             
             requirements = _generate_requirements_for_role(template['title'])
             
-            job_data = {
-                "id": str(uuid.uuid4()),
+            new_jobs.append({
+                "id": new_id(),
                 "title": template['title'],
                 "company": template['company'],
                 "location": template['location'],
@@ -220,34 +460,43 @@ async def populate_jobs_from_api():
                 "requirements": requirements,
                 "skills_extracted": [],
                 "created_at": datetime.now(timezone.utc).isoformat()
-            }
-            
-            # Check if job already exists
-            existing = await db.jobs.find_one({"title": job_data["title"], "company": job_data["company"]})
-            if not existing:
-                await db.jobs.insert_one(job_data)
-                jobs_created += 1
+            })
+            existing.add((template['title'], template['company']))
+        
+        if new_jobs:
+            await _attach_job_skills(new_jobs)
+            await db.jobs.insert_many(new_jobs, ordered=False)
+        jobs_created = len(new_jobs)
         
         return jobs_created
     except Exception as e:
         logging.error(f"Error populating jobs: {e}")
         return 0
 
+_REQUIREMENTS_MAP = {
+    "Software Engineer": "Bachelor's degree in Computer Science or related field. 3+ years of experience with Python, Java, or C++. Experience with cloud platforms and databases.",
+    "Frontend Developer": "Strong experience with React, JavaScript, HTML5, CSS3. Knowledge of modern frontend tools and frameworks. Experience with responsive design.",
+    "Backend Developer": "Proficiency in server-side languages (Python, Node.js, Java). Experience with REST APIs, databases, and cloud services.",
+    "Full Stack Developer": "Experience with both frontend (React, Vue) and backend (Node.js, Python) technologies. Knowledge of databases and cloud platforms.",
+    "DevOps Engineer": "Experience with CI/CD pipelines, Docker, Kubernetes. Knowledge of AWS/Azure/GCP. Infrastructure as code experience.",
+    "Data Scientist": "Strong background in Python, R, SQL. Experience with machine learning frameworks. Statistical analysis and data visualization skills.",
+    "Product Manager": "5+ years of product management experience. Strong analytical and communication skills. Experience with agile methodologies.",
+    "UX Designer": "Portfolio demonstrating user-centered design. Proficiency in design tools (Figma, Sketch). User research experience.",
+    "QA Engineer": "Experience with automated testing frameworks. Knowledge of testing methodologies. Programming skills in Python or Java.",
+    "Mobile Developer": "Experience with React Native, Flutter, or native iOS/Android development. App store publishing experience."
+}
+
 def _generate_requirements_for_role(title: str) -> str:
     """Generate requirements based on job title"""
-    requirements_map = {
-        "Software Engineer": "Bachelor's degree in Computer Science or related field. 3+ years of experience with Python, Java, or C++. Experience with cloud platforms and databases.",
-        "Frontend Developer": "Strong experience with React, JavaScript, HTML5, CSS3. Knowledge of modern frontend tools and frameworks. Experience with responsive design.",
-        "Backend Developer": "Proficiency in server-side languages (Python, Node.js, Java). Experience with REST APIs, databases, and cloud services.",
-        "Full Stack Developer": "Experience with both frontend (React, Vue) and backend (Node.js, Python) technologies. Knowledge of databases and cloud platforms.",
-        "DevOps Engineer": "Experience with CI/CD pipelines, Docker, Kubernetes. Knowledge of AWS/Azure/GCP. Infrastructure as code experience.",
-        "Data Scientist": "Strong background in Python, R, SQL. Experience with machine learning frameworks. Statistical analysis and data visualization skills.",
-        "Product Manager": "5+ years of product management experience. Strong analytical and communication skills. Experience with agile methodologies.",
-        "UX Designer": "Portfolio demonstrating user-centered design. Proficiency in design tools (Figma, Sketch). User research experience.",
-        "QA Engineer": "Experience with automated testing frameworks. Knowledge of testing methodologies. Programming skills in Python or Java.",
-        "Mobile Developer": "Experience with React Native, Flutter, or native iOS/Android development. App store publishing experience."
-    }
-    return requirements_map.get(title, "Relevant experience and strong problem-solving skills required.")
+    return _REQUIREMENTS_MAP.get(title, "Relevant experience and strong problem-solving skills required.")
+
+def _extract_pdf_text(contents: bytes) -> str:
+    """Extract text from all pages of a PDF"""
+    pdf = pdfium.PdfDocument(io.BytesIO(contents))
+    try:
+        return "\n".join(page.get_textpage().get_text_bounded() for page in pdf)
+    finally:
+        pdf.close()
 
 # Routes
 @api_router.get("/")
@@ -261,21 +510,16 @@ async def get_jobs(
     company: Optional[str] = Query(None, description="Filter by company")
 ):
     """Get all jobs with optional search and filters"""
-    # Ensure we have jobs in database
-    job_count = await db.jobs.count_documents({})
-    if job_count == 0:
-        await populate_jobs_from_api()
-    
     # Build query
     query = {}
     if search:
-        query["title"] = {"$regex": search, "$options": "i"}
+        query["title"] = {"$regex": re.escape(search), "$options": "i"}
     if location:
-        query["location"] = {"$regex": location, "$options": "i"}
+        query["location"] = {"$regex": re.escape(location), "$options": "i"}
     if company:
-        query["company"] = {"$regex": company, "$options": "i"}
+        query["company"] = {"$regex": re.escape(company), "$options": "i"}
     
-    jobs = await db.jobs.find(query).to_list(100)
+    jobs = await db.jobs.find(query, JOB_PROJECTION).to_list(100)
     return [Job(**parse_from_mongo(job)) for job in jobs]
 
 @api_router.post("/resume/upload")
@@ -285,15 +529,9 @@ async def upload_resume(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
     try:
-        # Read PDF content
+        # Read PDF content and extract text off the event loop
         contents = await file.read()
-        pdf_file = io.BytesIO(contents)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        # Extract text from all pages
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text() + "\n"
+        text_content = await asyncio.to_thread(_extract_pdf_text, contents)
         
         if not text_content.strip():
             raise HTTPException(status_code=400, detail="Could not extract text from PDF")
@@ -303,7 +541,7 @@ async def upload_resume(file: UploadFile = File(...)):
         
         # Save resume to database
         resume_data = {
-            "id": str(uuid.uuid4()),
+            "id": new_id(),
             "filename": file.filename,
             "text_content": text_content,
             "skills_extracted": skills,
@@ -341,91 +579,90 @@ async def analyze_job(job_id: str):
     
     # Extract skills if not already done
     if not job.get("skills_extracted"):
-        job_text = f"{job['title']} {job['description']} {job['requirements']}"
-        skills = await extract_skills_with_llm(job_text, "job description")
+        await _attach_job_skills([job])
         
         # Update job with extracted skills
         await db.jobs.update_one(
             {"id": job_id},
-            {"$set": {"skills_extracted": skills}}
+            {"$set": {
+                "skills_extracted": job["skills_extracted"],
+                "skills_extracted_version": job.get("skills_extracted_version")
+            }}
         )
-        job["skills_extracted"] = skills
     
     return {"job_id": job_id, "skills_extracted": job["skills_extracted"]}
 
+async def _save_matches(resume_id: str, scored: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+    """Upsert the scored matches for a resume with a single bulk write"""
+    if not scored:
+        return
+    
+    created_at = datetime.now(timezone.utc).isoformat()
+    ops = [
+        UpdateOne(
+            {"resume_id": resume_id, "job_id": job["id"]},
+            {
+                "$set": {**match_result, "created_at": created_at},
+                "$setOnInsert": {"id": new_id()}
+            },
+            upsert=True
+        )
+        for job, match_result in scored
+    ]
+    try:
+        await db.matches.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        # The unique (resume_id, job_id) index rejected upserts a concurrent run inserted first;
+        # those documents exist now, so retrying turns them into plain updates
+        write_errors = e.details.get("writeErrors", [])
+        if not write_errors or any(error["code"] != 11000 for error in write_errors):
+            raise
+        await db.matches.bulk_write([ops[error["index"]] for error in write_errors], ordered=False)
+
 @api_router.post("/match/{resume_id}")
 async def get_job_matches(resume_id: str):
     """Get job recommendations for a resume"""
-    resume = await db.resumes.find_one({"id": resume_id})
+    resume = await db.resumes.find_one({"id": resume_id}, RESUME_MATCH_PROJECTION)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    # Get all jobs
-    jobs = await db.jobs.find().to_list(100)
-    matches = []
+    # Job skills are extracted at insertion time and backfilled on startup
+    # Score every job locally, then only explain the top matches with the LLM
+    resume_lookup = _prepare_resume_skills(resume["skills_extracted"])
+    scored = [
+        (job, _score_job_match(resume_lookup, job["skills_extracted"]))
+        async for job in db.jobs.find({}, JOB_PROJECTION).limit(100)
+    ]
+    scored.sort(key=lambda item: item[1]["match_score"], reverse=True)
+    top_matches = scored[:TOP_MATCHES]
     
-    for job in jobs:
-        # Extract job skills if not already done
-        if not job.get("skills_extracted"):
-            job_text = f"{job['title']} {job['description']} {job['requirements']}"
-            job_skills = await extract_skills_with_llm(job_text, "job description")
-            await db.jobs.update_one(
-                {"id": job["id"]},
-                {"$set": {"skills_extracted": job_skills}}
-            )
-            job["skills_extracted"] = job_skills
-        
-        # Calculate match
-        match_result = await calculate_job_match(
-            resume["skills_extracted"],
-            job["skills_extracted"],
-            resume["text_content"],
-            job["description"]
-        )
-        
-        # Save match to database
-        match_data = {
-            "id": str(uuid.uuid4()),
-            "resume_id": resume_id,
-            "job_id": job["id"],
-            "match_score": match_result["match_score"],
-            "matching_skills": match_result["matching_skills"],
-            "missing_skills": match_result["missing_skills"],
-            "explanation": match_result["explanation"],
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Check if match already exists
-        existing_match = await db.matches.find_one({
-            "resume_id": resume_id,
-            "job_id": job["id"]
-        })
-        
-        if existing_match:
-            await db.matches.update_one(
-                {"resume_id": resume_id, "job_id": job["id"]},
-                {"$set": match_data}
-            )
-        else:
-            await db.matches.insert_one(match_data)
-        
-        # Add job details to match result
+    sem = asyncio.Semaphore(LLM_CONCURRENCY)
+    
+    async def _explain(match_result):
+        async with sem:
+            match_result["explanation"] = await _explain_job_match(match_result)
+    
+    await asyncio.gather(*[_explain(match_result) for _, match_result in top_matches])
+    
+    # Save matches to database in a single round-trip
+    await _save_matches(resume_id, scored)
+    
+    # Add job details to match results
+    matches = []
+    for job, match_result in top_matches:
         match_result["job"] = Job(**parse_from_mongo(job))
         matches.append(match_result)
     
-    # Sort by match score
-    matches.sort(key=lambda x: x["match_score"], reverse=True)
-    
     return {
         "resume_id": resume_id,
-        "total_matches": len(matches),
-        "matches": matches[:10]  # Return top 10 matches
+        "total_matches": len(scored),
+        "matches": matches
     }
 
 @api_router.get("/matches/{resume_id}", response_model=List[JobMatch])
 async def get_saved_matches(resume_id: str):
     """Get saved job matches for a resume"""
-    matches = await db.matches.find({"resume_id": resume_id}).to_list(100)
+    matches = await db.matches.find({"resume_id": resume_id}, {"_id": 0}).to_list(100)
     return [JobMatch(**parse_from_mongo(match)) for match in matches]
 
 # Include the router in the main app
@@ -446,6 +683,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def configure_event_loop():
+    loop = asyncio.get_running_loop()
+    
+    # Log callbacks that block the event loop for longer than 100 ms
+    if os.environ.get('ASYNCIO_DEBUG'):
+        loop.set_debug(True)
+        loop.slow_callback_duration = 0.1
+
+async def _remove_duplicate_matches():
+    """Keep only the newest match per (resume_id, job_id) so the unique index can be built"""
+    duplicates = db.matches.aggregate([
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": {"resume_id": "$resume_id", "job_id": "$job_id"}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ], allowDiskUse=True)
+    stale_ids = [stale_id async for group in duplicates for stale_id in group["ids"][1:]]
+    if stale_ids:
+        await db.matches.delete_many({"_id": {"$in": stale_ids}})
+        logger.info(f"Removed {len(stale_ids)} duplicate matches")
+
+@app.on_event("startup")
+async def create_indexes():
+    indexes = [
+        (db.jobs, [("id", 1)], None),
+        (db.resumes, [("id", 1)], None),
+        (db.matches, [("resume_id", 1), ("job_id", 1)], _remove_duplicate_matches),
+    ]
+    # Create each index independently so one failure doesn't skip the rest
+    for collection, keys, remove_duplicates in indexes:
+        try:
+            try:
+                await collection.create_index(keys, unique=True)
+            except OperationFailure as e:
+                # Legacy duplicates block the unique index; clean them up once and retry
+                if e.code != 11000 or remove_duplicates is None:
+                    raise
+                await remove_duplicates()
+                await collection.create_index(keys, unique=True)
+        except Exception as e:
+            logger.error(f"Error creating index {keys} on {collection.name}: {e}")
+
+async def _seed_jobs_if_empty():
+    """Populate the jobs collection from the external API when it is empty"""
+    try:
+        if not await db.jobs.count_documents({}, limit=1):
+            await populate_jobs_from_api()
+    except Exception as e:
+        logger.error(f"Error seeding jobs: {e}")
+
+@app.on_event("startup")
+async def seed_jobs():
+    # Seed in the background so neither startup nor the first /jobs request waits on Mongo
+    app.state.seed_jobs_task = asyncio.create_task(_seed_jobs_if_empty())
+
+@app.on_event("startup")
+async def start_skills_backfill():
+    app.state.skills_backfill_task = asyncio.create_task(_backfill_job_skills())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
\ No newline at end of file
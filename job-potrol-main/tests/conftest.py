@@ -0,0 +1,29 @@
+import os
+import sys
+import types
+from pathlib import Path
+
+# The backend is run from its own directory, so its modules import each other flatly
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+
+# Tests replace every Gemini chat with a fake, so the LLM SDK is only needed to import server
+try:
+    import emergentintegrations.llm.chat  # noqa: F401
+except ImportError:
+    class UserMessage:
+        def __init__(self, text):
+            self.text = text
+
+    class LlmChat:
+        def __init__(self, **kwargs):
+            raise RuntimeError("LlmChat is not available in tests; patch server._new_chat instead")
+
+    chat_module = types.ModuleType("emergentintegrations.llm.chat")
+    chat_module.UserMessage = UserMessage
+    chat_module.LlmChat = LlmChat
+    sys.modules["emergentintegrations"] = types.ModuleType("emergentintegrations")
+    sys.modules["emergentintegrations.llm"] = types.ModuleType("emergentintegrations.llm")
+    sys.modules["emergentintegrations.llm.chat"] = chat_module
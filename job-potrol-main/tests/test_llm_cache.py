@@ -0,0 +1,65 @@
+from llm_cache import LlmResponseCache, normalize_text
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_returns_stored_value():
+    cache = LlmResponseCache()
+    cache.put(("skills", "resume", "python, java"), ["Python", "Java"])
+
+    assert cache.get(("skills", "resume", "python, java")) == ["Python", "Java"]
+
+
+def test_get_misses_on_different_key():
+    cache = LlmResponseCache()
+    cache.put(("skills", "resume", "python"), ["Python"])
+
+    assert cache.get(("skills", "job description", "python")) is None
+    assert cache.get(("skills", "resume", "java")) is None
+
+
+def test_explanation_keys_distinguish_skill_lists():
+    cache = LlmResponseCache()
+    react = ("explanation", 50.0, ("React", "Javascript"), ("Css3", "Html5"))
+    java = ("explanation", 50.0, ("Java", "Spring"), ("Sql", "Docker"))
+    cache.put(react, "Strong frontend fit.")
+
+    assert cache.get(java) is None
+    # Swapping the matching and missing lists must not reuse the explanation
+    assert cache.get(("explanation", 50.0, ("Css3", "Html5"), ("React", "Javascript"))) is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LlmResponseCache(ttl_seconds=10, clock=clock)
+    cache.put("key", "value")
+
+    clock.now = 10
+    assert cache.get("key") == "value"
+    clock.now = 11
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LlmResponseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_normalize_text_ignores_case_and_whitespace():
+    assert normalize_text("  Senior  Python\nDeveloper ") == normalize_text("senior python developer")
+    assert normalize_text("Kubernetes") != normalize_text("Terraform")
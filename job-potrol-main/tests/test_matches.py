@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import BulkWriteError, OperationFailure
+
+import server
+
+
+class FakeCollection:
+    """Records writes and raises queued errors from bulk_write/create_index"""
+
+    def __init__(self, name, errors=()):
+        self.name = name
+        self.errors = list(errors)
+        self.bulk_writes = []
+        self.created_indexes = []
+
+    async def bulk_write(self, ops, ordered=True):
+        self.bulk_writes.append(ops)
+        if self.errors:
+            raise self.errors.pop(0)
+
+    async def create_index(self, keys, unique=False):
+        self.created_indexes.append(keys)
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+def _scored(*job_ids):
+    return [({"id": job_id}, {"match_score": 50.0, "matching_skills": [], "missing_skills": [], "explanation": None}) for job_id in job_ids]
+
+
+def test_save_matches_retries_upserts_rejected_as_duplicates(monkeypatch):
+    duplicate = BulkWriteError({"writeErrors": [{"index": 1, "code": 11000}]})
+    matches = FakeCollection("matches", errors=[duplicate])
+    monkeypatch.setattr(server, "db", SimpleNamespace(matches=matches))
+
+    asyncio.run(server._save_matches("resume-1", _scored("job-a", "job-b", "job-c")))
+
+    first, retry = matches.bulk_writes
+    assert len(first) == 3
+    assert retry == [first[1]]
+
+
+def test_save_matches_raises_other_write_errors(monkeypatch):
+    failure = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}, {"index": 1, "code": 121}]})
+    matches = FakeCollection("matches", errors=[failure])
+    monkeypatch.setattr(server, "db", SimpleNamespace(matches=matches))
+
+    with pytest.raises(BulkWriteError):
+        asyncio.run(server._save_matches("resume-1", _scored("job-a", "job-b")))
+    assert len(matches.bulk_writes) == 1
+
+
+def test_duplicate_matches_are_removed_only_when_the_unique_index_fails(monkeypatch):
+    cleanups = []
+
+    async def remove_duplicate_matches():
+        cleanups.append(True)
+
+    monkeypatch.setattr(server, "_remove_duplicate_matches", remove_duplicate_matches)
+
+    clean_db = SimpleNamespace(jobs=FakeCollection("jobs"), resumes=FakeCollection("resumes"), matches=FakeCollection("matches"))
+    monkeypatch.setattr(server, "db", clean_db)
+    asyncio.run(server.create_indexes())
+    assert cleanups == []
+
+    duplicate_key = OperationFailure("E11000 duplicate key error", code=11000)
+    dirty_db = SimpleNamespace(jobs=FakeCollection("jobs"), resumes=FakeCollection("resumes"), matches=FakeCollection("matches", errors=[duplicate_key]))
+    monkeypatch.setattr(server, "db", dirty_db)
+    asyncio.run(server.create_indexes())
+    assert cleanups == [True]
+    assert len(dirty_db.matches.created_indexes) == 2
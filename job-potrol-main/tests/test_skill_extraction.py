@@ -0,0 +1,148 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import server
+from llm_cache import LlmResponseCache
+
+
+class FakeLlm:
+    """Records prompts sent to Gemini and answers them with canned replies per chat purpose"""
+
+    def __init__(self):
+        self.calls = []
+        self.replies = {}
+
+    def new_chat(self, purpose):
+        return FakeChat(self, purpose)
+
+
+class FakeChat:
+    def __init__(self, llm, purpose):
+        self._llm = llm
+        self._purpose = purpose
+
+    async def send_message(self, user_message):
+        self._llm.calls.append(user_message.text)
+        await asyncio.sleep(0.01)
+        return self._llm.replies[self._purpose](user_message.text)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLlm()
+    monkeypatch.setattr(server, "_new_chat", fake.new_chat)
+    monkeypatch.setattr(server, "llm_cache", LlmResponseCache())
+    return fake
+
+
+def test_batch_maps_skills_by_id(llm):
+    llm.replies["skills-extraction-batch"] = lambda text: json.dumps({"a": ["python", "docker"], "b": ["react"]})
+
+    result = asyncio.run(server.extract_skills_batch([("a", "Python and Docker"), ("b", "React")]))
+
+    assert result == {"a": ["Python", "Docker"], "b": ["React"]}
+    assert len(llm.calls) == 1
+
+
+def test_batch_accepts_echoed_id_markers(llm):
+    llm.replies["skills-extraction-batch"] = lambda text: "```json\n" + json.dumps({"[a]": ["python"]}) + "\n```"
+
+    result = asyncio.run(server.extract_skills_batch([("a", "Python")]))
+
+    assert result == {"a": ["Python"]}
+
+
+def test_failed_batch_falls_back_to_single_item_prompts(llm):
+    llm.replies["skills-extraction-batch"] = lambda text: "not json"
+    llm.replies["skills-extraction"] = lambda text: "Python, Java"
+
+    result = asyncio.run(server.extract_skills_batch([("a", "first job"), ("b", "second job")]))
+
+    assert result == {"a": ["Python", "Java"], "b": ["Python", "Java"]}
+    assert len(llm.calls) == 3
+
+
+def test_concurrent_analysis_of_same_job_makes_one_llm_call(llm):
+    llm.replies["skills-extraction-batch"] = lambda text: json.dumps({"job-1": ["python"]})
+    job = {"id": "job-1", "title": "Backend Developer", "description": "Build APIs", "requirements": "Python"}
+    first, second = dict(job), dict(job)
+
+    async def analyze_twice():
+        await asyncio.gather(server._attach_job_skills([first]), server._attach_job_skills([second]))
+
+    asyncio.run(analyze_twice())
+
+    assert first["skills_extracted"] == second["skills_extracted"] == ["Python"]
+    assert len(llm.calls) == 1
+
+
+def test_single_and_batched_extraction_share_one_llm_call(llm):
+    llm.replies["skills-extraction-batch"] = lambda text: json.dumps({"a": ["python"]})
+    llm.replies["skills-extraction"] = lambda text: "Python"
+
+    async def extract_both():
+        return await asyncio.gather(
+            server.extract_skills_batch([("a", "Python developer")]),
+            server.extract_skills_with_llm("Python developer"),
+        )
+
+    batched, single = asyncio.run(extract_both())
+
+    assert batched == {"a": ["Python"]}
+    assert single == ["Python"]
+    assert len(llm.calls) == 1
+
+
+def test_malformed_item_values_fall_back_to_single_item_prompts(llm):
+    llm.replies["skills-extraction-batch"] = lambda text: json.dumps({"a": None, "b": ["x y"], "c": 3, "d": {"skill": "go"}})
+    llm.replies["skills-extraction"] = lambda text: "Python"
+
+    result = asyncio.run(server.extract_skills_batch([("a", "first"), ("b", "second"), ("c", "third"), ("d", "fourth")]))
+
+    assert result == {"a": ["Python"], "b": ["X Y"], "c": ["Python"], "d": ["Python"]}
+    assert len(llm.calls) == 4
+
+
+class FakeJobs:
+    """Jobs collection returning pending jobs from find and recording writes"""
+
+    def __init__(self, pending):
+        self.pending = pending
+        self.update_many_calls = []
+        self.bulk_writes = []
+
+    async def update_many(self, query, update):
+        self.update_many_calls.append((query, update))
+
+    def find(self, query, projection):
+        async def cursor():
+            for job in self.pending:
+                yield job
+        return cursor()
+
+    async def bulk_write(self, ops, ordered=True):
+        self.bulk_writes.append(ops)
+
+
+def test_backfill_tags_existing_skills_and_writes_in_chunks(llm, monkeypatch):
+    llm.replies["skills-extraction-batch"] = lambda text: json.dumps(
+        {line[1:-1]: ["python"] for line in text.splitlines() if line.startswith("[")}
+    )
+    pending = [
+        {"id": f"job-{i}", "title": f"Job {i}", "description": f"Role {i}", "requirements": ""}
+        for i in range(5)
+    ]
+    jobs = FakeJobs(pending)
+    monkeypatch.setattr(server, "db", SimpleNamespace(jobs=jobs))
+    monkeypatch.setattr(server, "BACKFILL_CHUNK_SIZE", 2)
+
+    asyncio.run(server._backfill_job_skills())
+
+    (tag_query, tag_update), = jobs.update_many_calls
+    assert tag_query["skills_extracted_version"] == {"$exists": False}
+    assert tag_update == {"$set": {"skills_extracted_version": server.SKILLS_EXTRACTION_VERSION}}
+    assert [len(ops) for ops in jobs.bulk_writes] == [2, 2, 1]
+    assert all(job["skills_extracted"] == ["Python"] for job in pending)